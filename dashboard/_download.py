@@ -0,0 +1,33 @@
+import streamlit as st
+
+# Provides download button for interactive plotly graphs, HTML is only generated on click
+def download_button_graph(fig, filename, key):
+    def render_html():
+        return fig.to_html(include_plotlyjs = "cdn", validate = False)
+
+    st.download_button(
+        label = "Download interactive graph (HTML)",
+        data = render_html,
+        file_name = f"{filename}.html",
+        mime = "text/html",
+        key = key,
+        on_click = st.toast,
+        args = ("Download Started",)
+    )
+
+# Converts dataframe to CSV bytes, cached so repeated downloads reuse the result
+@st.cache_data
+def dataframe_to_csv(dataframe):
+    return dataframe.to_csv(index = False).encode("utf-8")
+
+# Provides download button for dataframe, CSV is only generated on click
+def download_button_dataframe(dataframe, label, filename_no_extension, key):
+    st.download_button(
+        label = f"Download {label}",
+        data = lambda: dataframe_to_csv(dataframe),
+        file_name = f"{filename_no_extension}.csv",
+        mime = "text/csv",
+        key = key,
+        on_click = st.toast,
+        args = ("Download Started",)
+    )
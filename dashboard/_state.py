@@ -0,0 +1,19 @@
+import json
+import pandas as pd
+import pathlib
+import streamlit as st
+
+# Application state storage, read by loaders shared across all pages so state is loaded once per process
+state_path = pathlib.Path(__file__).parent.parent / "store"
+
+# For loading a stored dataframe, optionally restricted to the given columns
+# Cached by reference as loaded state is only read, never modified in place
+@st.cache_resource(ttl = None)
+def load_df(name, columns = None):
+    return pd.read_parquet(state_path / f"{name}.parquet", engine = "pyarrow", columns = columns)
+
+# For loading non-dataframe application state
+@st.cache_resource(ttl = None, max_entries = 1)
+def load_scalars():
+    with open(state_path / "scalars.json", "r") as f:
+        return json.load(f)
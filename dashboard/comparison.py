@@ -1,51 +1,84 @@
-import io
-import pathlib
-import pickle
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-
-# For loading application state
-@st.cache_data
-def load_state(path):
-    with open(path, "rb") as f:
-        return pickle.load(f)
-
-# Provides download button for interactive plotly graphs
-def download_button_graph(fig, filename, key):
-    buffer = io.StringIO()
-    fig.write_html(buffer)
-    st.download_button(
-        label = "Download interactive graph (HTML)",
-        data = buffer.getvalue(),
-        file_name = filename,
-        mime = "text/html",
-        key = key
+from _download import download_button_dataframe, download_button_graph
+from _state import load_df, load_scalars
+
+# Joins test actuals with Prophet predictions and confidence bounds, shared by the Prophet and comparison tabs
+# Cached by reference without arguments so the join runs once per process
+@st.cache_resource
+def merge_prophet():
+    test = load_df("test")
+    prophet_forecasts = load_df("prophet_forecasts", columns = ["ds", "yhat", "yhat_lower", "yhat_upper"])
+    return test[["Order Date", "Sales"]].merge(
+        prophet_forecasts,
+        left_on = "Order Date",
+        right_on = "ds",
+        how = "inner"
     )
 
-# Provides download button for dataframe
-def download_button_dataframe(dataframe, label, filename_no_extension, key):
-    st.download_button(
-        label = f"Download {label}",
-        data = dataframe.to_csv(index = False),
-        file_name = f"{filename_no_extension}.csv",
-        mime = "text/csv",
-        key = key
+# Builds actual vs forecast line graph straight from arrays, skipping plotly express dataframe parsing
+def two_line_fig(index, actual, forecast, forecast_name):
+    fig = go.Figure([
+        go.Scatter(
+            x = index,
+            y = actual,
+            mode = "lines",
+            name = "Sales",
+            line = dict(color = "#0068C9")
+        ),
+        go.Scatter(
+            x = index,
+            y = forecast,
+            mode = "lines",
+            name = forecast_name,
+            line = dict(color = "#83C9FF")
+        )
+    ])
+    fig.update_layout(
+        xaxis_title = "Order Date",
+        yaxis_title = "Sales"
     )
+    return fig
+
+# Renders actual vs forecast graph and table of a baseline model inside its tab
+def render_baseline_tab(tab, baseline_test, forecast_col, display_name, file_stem, key):
+    with tab:
+        df_baseline = (
+            baseline_test[["Order Date", "Sales", forecast_col]]
+            .rename(columns = {forecast_col: display_name})
+            .set_index("Order Date")
+        )
+
+        st.subheader("Baseline vs Actual (Test Period)")
+        plot_baseline = two_line_fig(
+            df_baseline.index.values,
+            df_baseline["Sales"].values,
+            df_baseline[display_name].values,
+            display_name
+        )
+
+        st.plotly_chart(
+            figure_or_data = plot_baseline,
+            width = "stretch"
+        )
+
+        download_button_graph(plot_baseline, f"{file_stem}_graph", f"{key}_graph")
+
+        st.dataframe(df_baseline)
+        download_button_dataframe(df_baseline, display_name, f"{file_stem}_table", f"{key}_table")
 
 # Load Application State
 try:
-    state_path = pathlib.Path(__file__).parent.parent / "store" / "state_dump.pkl"
-    state_holder = load_state(state_path)
-
     # Forecast outputs
-    baseline_test = state_holder["baseline_forecasts"]
-    errors_table = state_holder["errors"]
-    future_forecast = state_holder["forecast"].tail(6)
+    baseline_test = load_df("baseline_forecasts")
+    errors_table = load_df("errors")
+    prophet_test = merge_prophet()
+    scalars = load_scalars()
 
     # Forecast outputs
-    forecast_6m = future_forecast["yhat"].sum()
-    avg_sales = state_holder["monthly_sales"]["Sales"].mean()
+    forecast_6m = scalars["forecast_6m_total"]["All Categories"]
+    avg_sales = scalars["avg_sales"]
 
     # KPI calculations
     prophet_mae = errors_table.loc["Prophet", "MAE"]
@@ -57,10 +90,10 @@ except Exception as e:
     st.error(f"Errors encountered while starting project: {e}")
     st.stop()
 
-# Identify Best Model Based on MAE
-best_model = errors_table["MAE"].idxmin()
-best_mae = errors_table.loc[best_model, "MAE"]
-best_mape = errors_table.loc[best_model, "MAPE"]
+# Best Model Based on MAE
+best_model = scalars["best_model"]
+best_mae = scalars["best_mae"]
+best_mape = scalars["best_mape"]
 
 # Page configuration
 page_title = "Model Comparison"
@@ -90,120 +123,38 @@ with st.expander("Errors Summary"):
     )
     
     download_button_dataframe(errors_table, "Errors Table", "errors", "error_df")
-    if st.session_state.error_df:
-        st.toast("Download Started")
 
 
 st.success(f"Selected Model: {best_model}")
 
 baseline, prophet, comparisons = st.tabs(["Baseline Forecast", "Prophet", "Error Comparison"])
 
-# Baseline Forecast Models
-with baseline:
-    naive, ma, seasonal = st.tabs(tabs = ["Naïve Forecast", "Moving Average Forecast", "Seasonal Naïve Forecast"])
-    
-    with naive:
-        df_naive = (
-            baseline_test[["Order Date", "Sales", "naive_forecast"]]
-            .reset_index(drop = True)
-            .rename(columns = {"naive_forecast": "Naïve Forecast"})
-        )
-        df_naive = df_naive.set_index("Order Date")
-
-        st.subheader("Baseline vs Actual (Test Period)")
-        plot_naive = px.line(
-            data_frame = df_naive,
-            color_discrete_sequence = ["#0068C9", "#83C9FF"]
-        )
-
-        st.plotly_chart(
-            figure_or_data = plot_naive,
-            width = "stretch"
-        )
-
-        download_button_graph(plot_naive, "naive_forecast_graph.html", "naive_graph")
-        if st.session_state.naive_graph:
-            st.toast("Download Started")
-
-        st.dataframe(df_naive)
-        download_button_dataframe(df_naive, "Naive Forecast", "naive_forecast_table", "naive_table")
-        if st.session_state.naive_table:
-            st.toast("Download Started")
-
-    with ma:
-        df_ma = (
-            baseline_test[["Order Date", "Sales", "ma_forecast"]]
-            .reset_index(drop = True)
-            .rename(columns = {"ma_forecast": "Moving Average Forecast"})
-        )
-        df_ma = df_ma.set_index("Order Date")
+# Baseline Forecast Models as (forecast column, display name, file name stem, widget key prefix)
+baseline_models = [
+    ("naive_forecast", "Naïve Forecast", "naive_forecast", "naive"),
+    ("ma_forecast", "Moving Average Forecast", "moving_average_forecast", "ma"),
+    ("seasonal_naive_forecast", "Seasonal Naïve Forecast", "seasonal_naive_forecast", "seasonal")
+]
 
-        st.subheader("Baseline vs Actual (Test Period)")
-        plot_ma = px.line(
-            data_frame = df_ma,
-            color_discrete_sequence = ["#0068C9", "#83C9FF"]
-        )
-
-        st.plotly_chart(
-            figure_or_data = plot_ma,
-            width = "stretch"
-        )
-        
-        download_button_graph(plot_ma, "moving_average_forecast_graph.html", "ma_graph")
-        if st.session_state.ma_graph:
-            st.toast("Download Started")
-
-        st.dataframe(df_ma)
-        download_button_dataframe(df_ma, "Moving Average Forecast", "moving_average_forecast_table", "ma_table")
-        if st.session_state.ma_table:
-            st.toast("Download Started")
-
-    with seasonal:
-        df_seasonal = (
-            baseline_test[["Order Date", "Sales", "seasonal_naive_forecast"]]
-            .reset_index(drop = True)
-            .rename(columns = {"seasonal_naive_forecast": "Seasonal Naïve Forecast"})
-        )
-        df_seasonal = df_seasonal.set_index("Order Date")
-
-        st.subheader("Baseline vs Actual (Test Period)")
-        plot_seasonal = px.line(
-            data_frame = df_seasonal,
-            color_discrete_sequence = ["#0068C9", "#83C9FF"]
-        )
-        st.plotly_chart(
-            figure_or_data = plot_seasonal,
-            width = "stretch"
-        )
-        
-        download_button_graph(plot_seasonal, "seasonal_naive_forecast_graph.html", "seasonal_graph")
-        if st.session_state.seasonal_graph:
-            st.toast("Download Started")
-
-        st.dataframe(df_seasonal)
-        download_button_dataframe(df_seasonal, "Seasonal Naïve Forecast", "seasonal_naive_forecast_table", "seasonal_table")
-        if st.session_state.seasonal_table:
-            st.toast("Download Started")
+with baseline:
+    baseline_tabs = st.tabs(tabs = [display_name for _, display_name, _, _ in baseline_models])
+    for tab, (forecast_col, display_name, file_stem, key) in zip(baseline_tabs, baseline_models):
+        render_baseline_tab(tab, baseline_test, forecast_col, display_name, file_stem, key)
 
 # Prophet Model Evaluation
 with prophet:
     df_prophet = (
-        state_holder["test"]
-        .merge(
-            state_holder["prophet_forecasts"][["ds", "yhat"]],
-            left_on = "Order Date",
-            right_on = "ds",
-            how = "inner"
-        )
-        .drop(columns = "ds")
+        prophet_test[["Order Date", "Sales", "yhat"]]
         .rename(columns = {"yhat": "Prophet Forecast"})
+        .set_index("Order Date")
     )
-    df_prophet = df_prophet.set_index("Order Date")
 
     st.subheader("Prophet vs Actual (Test Period)")
-    plot_prophet = px.line(
-        data_frame = df_prophet,
-        color_discrete_sequence = ["#0068C9", "#83C9FF"]
+    plot_prophet = two_line_fig(
+        df_prophet.index.values,
+        df_prophet["Sales"].values,
+        df_prophet["Prophet Forecast"].values,
+        "Prophet Forecast"
     )
 
     st.plotly_chart(
@@ -211,22 +162,18 @@ with prophet:
         width = "stretch"
     )
 
-    download_button_graph(plot_prophet, "prophet_forecast_graph.html", "prophet_graph")
-    if st.session_state.prophet_graph:
-        st.toast("Download Started")
+    download_button_graph(plot_prophet, "prophet_forecast_graph", "prophet_graph")
 
     st.dataframe(df_prophet)
     download_button_dataframe(df_prophet, "Prophet Forecast", "prophet_forecast_table", "prophet_table")
-    if st.session_state.prophet_table:
-        st.toast("Download Started")
 
 # Model Comparison
 with comparisons:
     st.subheader("MAE by Model (Lower is Better)")
-    chart_df_a = errors_table["MAE"].reset_index()
-    chart_df_a = chart_df_a.set_index("Model")
     plot_a = px.bar(
-        data_frame = chart_df_a,
+        x = errors_table.index,
+        y = errors_table["MAE"],
+        labels = {"x": "Model", "y": "MAE"},
         text_auto = ".2f",
         color_discrete_sequence = ["#0068C9"]
     )
@@ -234,26 +181,14 @@ with comparisons:
         figure_or_data = plot_a,
         width = "stretch"
     )
-    download_button_graph(plot_a, "mae_graph.html", "mae_graph")
-    if st.session_state.mae_graph:
-        st.toast("Download Started")
-
-    plot_df = (
-        state_holder["test"][["Order Date", "Sales"]]
-        .rename(columns = {"Order Date": "ds", "Sales": "actual"})
-        .merge(
-            state_holder["prophet_forecasts"][["ds", "yhat", "yhat_lower", "yhat_upper"]],
-            on = "ds",
-            how = "inner"
-        )
-    )
+    download_button_graph(plot_a, "mae_graph", "mae_graph")
 
     fig = go.Figure()
 
     fig.add_trace(
         go.Scatter(
-            x = plot_df["ds"],
-            y = plot_df["actual"],
+            x = prophet_test["ds"],
+            y = prophet_test["Sales"],
             mode = "lines",
             name = "Actual Sales",
             line = dict(color = "black")
@@ -262,8 +197,8 @@ with comparisons:
 
     fig.add_trace(
         go.Scatter(
-            x = plot_df["ds"],
-            y = plot_df["yhat"],
+            x = prophet_test["ds"],
+            y = prophet_test["yhat"],
             mode = "lines",
             name = "Prophet Forecast",
             line = dict(color = "#1f77b4", dash = "solid")
@@ -272,8 +207,8 @@ with comparisons:
 
     fig.add_trace(
         go.Scatter(
-            x = plot_df["ds"],
-            y = plot_df["yhat_lower"],
+            x = prophet_test["ds"],
+            y = prophet_test["yhat_lower"],
             mode = "lines",
             line = dict(width = 0),
             showlegend = False
@@ -282,8 +217,8 @@ with comparisons:
 
     fig.add_trace(
         go.Scatter(
-            x = plot_df["ds"],
-            y = plot_df["yhat_upper"],
+            x = prophet_test["ds"],
+            y = prophet_test["yhat_upper"],
             mode = "lines",
             fill = "tonexty",
             fillcolor = "rgba(31, 119, 180, 0.2)",
@@ -305,16 +240,14 @@ with comparisons:
         figure_or_data = fig, 
         width = "stretch"
     )
-    download_button_graph(fig, "prophet_forecast.html", "forecast_graph")
-    if st.session_state.forecast_graph:
-        st.toast("Download Started")
+    download_button_graph(fig, "prophet_forecast", "forecast_graph")
 
     with st.expander("Other Error Metrics"):
         st.subheader("MSE by Model (Lower is Better)")
-        chart_df_b = errors_table["MSE"].reset_index()
-        chart_df_b = chart_df_b.set_index("Model")
         plot_b = px.bar(
-            data_frame = chart_df_b,
+            x = errors_table.index,
+            y = errors_table["MSE"],
+            labels = {"x": "Model", "y": "MSE"},
             text_auto = ".2f",
             color_discrete_sequence = ["#0068C9"]
         )
@@ -322,16 +255,13 @@ with comparisons:
             figure_or_data = plot_b,
             width = "stretch"
         )
-        download_button_graph(plot_b, "mse_graph.html", "mse_graph")
-        if st.session_state.mse_graph:
-            st.toast("Download Started")
+        download_button_graph(plot_b, "mse_graph", "mse_graph")
 
         st.subheader("MAPE % by Model (Lower is Better)")
-        chart_df_c = errors_table["MAPE"].reset_index()
-        chart_df_c = chart_df_c.set_index("Model")
-        chart_df_c = chart_df_c["MAPE"]*100
         plot_c = px.bar(
-            data_frame = chart_df_c,
+            x = errors_table.index,
+            y = errors_table["MAPE"] * 100,
+            labels = {"x": "Model", "y": "MAPE %"},
             text_auto = ".2f",
             color_discrete_sequence = ["#0068C9"]
         )
@@ -339,15 +269,13 @@ with comparisons:
             figure_or_data = plot_c,
             width = "stretch"
         )
-        download_button_graph(plot_c, "mape_graph.html", "mape_graph")
-        if st.session_state.mape_graph:
-            st.toast("Download Started")
+        download_button_graph(plot_c, "mape_graph", "mape_graph")
 
         st.subheader("RMSE by Model (Lower is Better)")
-        chart_df_d = errors_table["RMSE"].reset_index()
-        chart_df_d = chart_df_d.set_index("Model")
         plot_d = px.bar(
-            data_frame = chart_df_d,
+            x = errors_table.index,
+            y = errors_table["RMSE"],
+            labels = {"x": "Model", "y": "RMSE"},
             text_auto = ".2f",
             color_discrete_sequence = ["#0068C9"]
         )
@@ -355,6 +283,4 @@ with comparisons:
             figure_or_data = plot_d,
             width = "stretch"
         )
-        download_button_graph(plot_d, "rmse_graph.html", "rmse_graph")
-        if st.session_state.rmse_graph:
-            st.toast("Download Started")
\ No newline at end of file
+        download_button_graph(plot_d, "rmse_graph", "rmse_graph")
\ No newline at end of file
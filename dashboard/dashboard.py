@@ -1,5 +1,9 @@
+import plotly.io as pio
 import streamlit as st
 
+# Serialize plotly figures with orjson for faster chart rendering
+pio.json.config.default_engine = "orjson"
+
 # Application navigation and page routing
 mainpage = st.Page("mainpage.py", title = "Sales Forecast Dashboard", icon = "📈")
 dataset = st.Page("dataset_info.py", title = "Dataset Overview", icon = "📋")
@@ -1,45 +1,57 @@
-import io
 import pandas as pd
-import pathlib
-import pickle
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from _download import download_button_dataframe, download_button_graph
+from _state import load_df, load_scalars
 
-# For loading application state
-@st.cache_data
-def load_state(path):
-    with open(path, "rb") as f:
-        return pickle.load(f)
-
-# Provides download button for interactive plotly graphs
-def download_button_graph(fig, filename, key):
-    buffer = io.StringIO()
-    fig.write_html(buffer)
-    st.download_button(
-        label = "Download interactive graph (HTML)",
-        data = buffer.getvalue(),
-        file_name = f"{filename}.html",
-        mime = "text/html",
-        key = key
-    )
+# Loads the dataset indexed by Row ID, cached by reference so the index is built once per process
+@st.cache_resource
+def load_dataset():
+    return load_df("dataframe").set_index("Row ID")
 
-# Provides download button for dataframe
-def download_button_dataframe(dataframe, label, filename_no_extension, key):
-    st.download_button(
-        label = f"Download {label}",
-        data = dataframe.to_csv(index = False),
-        file_name = f"{filename_no_extension}.csv",
-        mime = "text/csv",
-        key = key
+# Builds per-column dtype and missing value summary of the dataset
+@st.cache_data
+def build_summary():
+    dataframe = load_dataset()
+    return pd.DataFrame({
+        "Column": dataframe.columns,
+        "Dtype": dataframe.dtypes.astype(str),
+        "Missing %": (
+            dataframe.isna().mean() * 100
+        ).round(2)
+    })
+
+# Resamples daily sales to weekly means for plotting when the series has too many points to draw
+@st.cache_data
+def downsample_daily(max_points = 1000):
+    df_daily = load_df("time_series_daily")
+    if len(df_daily) <= max_points:
+        return df_daily
+    return (
+        df_daily
+        .set_index("Order Date")[["Sales", "Rolling_Mean_30", "Rolling_Std_30"]]
+        .resample("W")
+        .mean()
+        .reset_index()
     )
 
 # Load Application State
 try:
-    state_path = pathlib.Path(__file__).parent.parent / "store" / "state_dump.pkl"
-    state_holder = load_state(state_path)
-    dataframe = state_holder["dataframe"].set_index("Row ID")
-    categorical_info = state_holder["categorical_info"]
+    scalars = load_scalars()
+    dataframe = load_dataset()
+    categorical_info = load_df("categorical_info")
+    monthly_sales = load_df("monthly_sales")
+    monthly_avg = load_df("monthly_avg", columns = ["Month", "Sales"])
+    df_daily = load_df("time_series_daily")
+    df_week = load_df("df_week")
+    category_sales = load_df("category_sales")
+    region_sales = load_df("region_sales")
+    segment_sales = load_df("segment_sales")
+    df_outliers = load_df("outliers")
+    invalid = load_df("invalid_sales")
+    duplicate_entries = load_df("duplicate_entries")
+    missing_dates = load_df("missing_dates")
 except FileNotFoundError as e:
     st.error(f"Required files not found in the project. Please generate the files by running training notebook before proceeding.")
     st.stop()
@@ -48,13 +60,7 @@ except Exception as e:
     st.stop()
 
 # Dataset summary
-summary = pd.DataFrame({
-    "Column": dataframe.columns,
-    "Dtype": dataframe.dtypes.astype(str),
-    "Missing %": (
-        dataframe.isna().mean() * 100
-    ).round(2)
-})
+summary = build_summary()
 
 # Page configuration
 page_title = "Dataset Overview"
@@ -70,17 +76,15 @@ st.title(page_title)
 c1, c2, c3, c4, c5, c6 = st.columns(6)
 c1.metric("Rows", dataframe.shape[0])
 c2.metric("Columns", dataframe.shape[1])
-c3.metric("Categorical Cols", len(state_holder["categorical_cols"]))
-c4.metric("Sales Outliers", len(state_holder["outliers"]))
-c5.metric("Missing Values", sum(state_holder["missing_values"].values()))
-c6.metric("Duplicate Count", len(state_holder["duplicate_entries"]))
+c3.metric("Categorical Cols", len(scalars["categorical_cols"]))
+c4.metric("Sales Outliers", len(df_outliers))
+c5.metric("Missing Values", sum(scalars["missing_values"].values()))
+c6.metric("Duplicate Count", len(duplicate_entries))
 
 # Column summary
 with st.expander("Column Summary"):
     st.dataframe(summary)
     download_button_dataframe(summary, "Column Summary", "column_summary", "column_summary")
-    if st.session_state.column_summary:
-        st.toast("Download Started")
 
 dataset, categorical, eda, addin = st.tabs(tabs = ["Dataset Contents", "Categorical Overview", "Exploratory Data Analysis (EDA)", "Additional Information"])
 
@@ -89,12 +93,27 @@ with dataset:
     st.multiselect(
         label = "Select columns to display",
         options = dataframe.columns,
-        default = dataframe.columns,
+        default = ["Order Date", "Category", "Segment", "Region", "Sales"],
         key = "selected_cols_data"
     )
 
+    # Only a preview of rows is sent to the browser unless the full table is requested
+    st.checkbox(
+        label = "Show full table",
+        key = "show_full_data"
+    )
+    st.slider(
+        label = "Rows to display",
+        min_value = 10,
+        max_value = min(1000, len(dataframe)),
+        value = 100,
+        disabled = st.session_state.show_full_data,
+        key = "rows_data"
+    )
+
+    rows = dataframe if st.session_state.show_full_data else dataframe.head(st.session_state.rows_data)
     st.dataframe(
-        data = dataframe[st.session_state.selected_cols_data],
+        data = rows[st.session_state.selected_cols_data],
         width = "stretch",
         height = "stretch"
     )
@@ -106,8 +125,6 @@ with categorical:
         width = "stretch"
     )
     download_button_dataframe(categorical_info, "Categorical Information", "categorical_info", "categorical_info")
-    if st.session_state.categorical_info:
-        st.toast("Download started")
 
 # Exploratory Data Analysis (EDA)
 with eda:
@@ -118,7 +135,7 @@ with eda:
     with st.expander("Monthly Stats", expanded = True):
         st.subheader("Monthly Sales Trend")
         monthly_sales_graph = px.line(
-            data_frame = state_holder["monthly_sales"],
+            data_frame = monthly_sales,
             x = "Order Date",
             y = "Sales",
             color_discrete_sequence = ["#0068C9"]
@@ -129,12 +146,10 @@ with eda:
             width = "stretch"
         )
         download_button_graph(monthly_sales_graph, "monthly_sales", "monthly_sales_graph")
-        if st.session_state.monthly_sales_graph:
-            st.toast("Download Started")
 
         st.subheader("Average Sales by Month")
         monthly_avg_graph = px.line(
-            data_frame = state_holder["monthly_avg"],
+            data_frame = monthly_avg,
             x = "Month",
             y = "Sales",
             color_discrete_sequence = ["#0068C9"]
@@ -145,12 +160,10 @@ with eda:
             width = "stretch"
         )
         download_button_graph(monthly_avg_graph, "monthly_avg", "monthly_avg_graph")
-        if st.session_state.monthly_avg_graph:
-            st.toast("Download Started")
 
         st.subheader("Box plot for Monthly Sales")
         monthly_sales_box = px.box(
-            data_frame = state_holder["monthly_sales"],
+            data_frame = monthly_sales,
             x = "Sales",
             color_discrete_sequence = ["#0068C9"]
         )
@@ -160,11 +173,8 @@ with eda:
             width = "stretch"
         )
         download_button_graph(monthly_sales_box, "monthly_sales_box", "monthly_sales_box")
-        if st.session_state.monthly_sales_box:
-            st.toast("Download Started")
 
         st.subheader("Sales Outliers (Transaction Level)")
-        df_outliers = state_holder["outliers"]    
         st.multiselect(
             label = "Select columns to display",
             options = df_outliers.columns,
@@ -177,16 +187,25 @@ with eda:
             width = "stretch"
         )
         download_button_dataframe(df_outliers, "Detected Outliers", "outliers", "outliers")
-        if st.session_state.outliers:
-            st.toast("Download Started")
 
     with st.expander("Daily Stats"):
+        # Labels for the plotted series, which is resampled to weekly averages for long date ranges
+        df_daily_plot = downsample_daily()
+        is_weekly = len(df_daily_plot) < len(df_daily)
+        sales_label = "Weekly Avg Sales" if is_weekly else "Daily Sales"
+        plot_title = "Weekly averages of daily records" if is_weekly else None
+        plot_caption = f"Showing weekly averages of {len(df_daily)} daily records. Full resolution data is available through the Daily Sales download."
+
         st.subheader("Daily Sales Trend")
-        df_daily = state_holder["time_series_daily"]
+        if is_weekly:
+            st.caption(plot_caption)
+
         time_series_daily_graph = px.line(
-            data_frame = df_daily,
+            data_frame = df_daily_plot,
             x = "Order Date",
             y = "Sales",
+            labels = {"Sales": sales_label},
+            title = plot_title,
             color_discrete_sequence = ["#0068C9"]
         )
 
@@ -195,26 +214,28 @@ with eda:
             width = "stretch"
         )
         download_button_graph(time_series_daily_graph, "time_series_daily", "time_series_daily_graph")
-        if st.session_state.time_series_daily_graph:
-            st.toast("Download Started")
+        download_button_dataframe(df_daily, "Daily Sales", "time_series_daily", "time_series_daily_table")
 
         st.subheader("Rolling Mean and Volatility (30-Day Window)")
+        if is_weekly:
+            st.caption(plot_caption)
+
         fig = go.Figure()
 
         fig.add_trace(
             go.Scatter(
-                x = df_daily["Order Date"],
-                y = df_daily["Sales"],
+                x = df_daily_plot["Order Date"],
+                y = df_daily_plot["Sales"],
                 mode = "lines",
-                name = "Daily Sales",
+                name = sales_label,
                 line = dict(color = "#0068C9", dash = "solid")
             )
         )
 
         fig.add_trace(
             go.Scatter(
-                x = df_daily["Order Date"],
-                y = df_daily["Rolling_Mean_30"],
+                x = df_daily_plot["Order Date"],
+                y = df_daily_plot["Rolling_Mean_30"],
                 mode = "lines",
                 name = "30-Day Rolling Mean",
                 line = dict(color = "#68C900", dash = "solid")
@@ -223,28 +244,25 @@ with eda:
 
         fig.add_trace(
             go.Scatter(
-                x = df_daily["Order Date"],
-                y = df_daily["Rolling_Std_30"],
+                x = df_daily_plot["Order Date"],
+                y = df_daily_plot["Rolling_Std_30"],
                 mode = "lines",
                 name = "30-Day Rolling Std",
                 line = dict(color = "#C90068", dash = "solid")
             )
         )
+        fig.update_layout(title = plot_title)
 
         st.plotly_chart(
             figure_or_data = fig,
             width = "stretch"
         )
         download_button_graph(fig, "rolling_mean_and_volatility", "rolling_mean_and_volatility")
-        if st.session_state.rolling_mean_and_volatility:
-            st.toast("Download Started")
 
         st.subheader("Average Sales by Day of Week")
-        df_week = df_daily.groupby("DayOfWeek")["Sales"].mean().reindex(
-            ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        )
         df_week_graph = px.bar(
-            df_week,
+            data_frame = df_week,
+            x = "DayOfWeek",
             y = "Sales",
             color_discrete_sequence = ["#0068C9"]
         )
@@ -255,13 +273,11 @@ with eda:
             width = "stretch"
         )
         download_button_graph(df_week_graph, "df_week_graph", "df_week_graph")
-        if st.session_state.df_week_graph:
-            st.toast("Download Started")
 
     with st.expander("Total Sales by Feature"):
         st.subheader("Total Sales by Category")
         category_sales_graph = px.bar(
-            data_frame = state_holder["category_sales"],
+            data_frame = category_sales,
             x = "Category",
             y = "Sales",
             color_discrete_sequence = ["#0068C9"]
@@ -272,12 +288,10 @@ with eda:
             width = "stretch"
         )
         download_button_graph(category_sales_graph, "category_sales_graph", "category_sales_graph")
-        if st.session_state.category_sales_graph:
-            st.toast("Download Started")
 
         st.subheader("Total Sales by Region")
         region_sales_graph = px.bar(
-            data_frame = state_holder["region_sales"],
+            data_frame = region_sales,
             x = "Region",
             y = "Sales",
             color_discrete_sequence = ["#0068C9"]
@@ -288,12 +302,10 @@ with eda:
             width = "stretch"
         )
         download_button_graph(region_sales_graph, "region_sales_graph", "region_sales_graph")
-        if st.session_state.region_sales_graph:
-            st.toast("Download Started")
 
         st.subheader("Total Sales by Segment")
         segment_sales_graph = px.bar(
-            data_frame = state_holder["segment_sales"],
+            data_frame = segment_sales,
             x = "Segment",
             y = "Sales",
             color_discrete_sequence = ["#0068C9"]
@@ -304,13 +316,10 @@ with eda:
             width = "stretch"
         )
         download_button_graph(segment_sales_graph, "segment_sales_graph", "segment_sales_graph")
-        if st.session_state.segment_sales_graph:
-            st.toast("Download Started")
 
 # Additional Information
 with addin:
     st.subheader("Invalid Sales")
-    invalid = state_holder["invalid_sales"]
     if len(invalid) > 0:
         st.warning(f"{len(invalid)} invalid sales entries are found in the dataset")
         st.dataframe(
@@ -318,13 +327,10 @@ with addin:
             width = "stretch"
         )
         download_button_dataframe(invalid, "Invalid Sales Records", "invalid_sales", "invalid_sales")
-        if st.session_state.invalid_sales:
-            st.toast("Download Started")
     else:
         st.success("No invalid sales entries are found in the dataset")
 
     st.subheader("Duplicate Entries")
-    duplicate_entries = state_holder["duplicate_entries"]
     if len(duplicate_entries) > 0:
         st.warning(f"{len(duplicate_entries)} duplicate entries are found in the dataset")
         st.dataframe(
@@ -332,13 +338,10 @@ with addin:
             width = "stretch"
         )
         download_button_dataframe(duplicate_entries, "Duplicate Entries", "duplicate_entries", "duplicate_entries")
-        if st.session_state.duplicate_entries:
-            st.toast("Download Started")
     else:
         st.success("No duplicate entries are found in the dataset")
 
     st.subheader("Missing Dates")
-    missing_dates = state_holder["missing_dates"]
 
     if(len(missing_dates) > 0):
         st.warning(f"{len(missing_dates)} missing dates are found in the dataset")
@@ -347,7 +350,5 @@ with addin:
             width = "stretch"
         )
         download_button_dataframe(missing_dates, "Missing Dates", "missing_dates", "missing_dates")
-        if st.session_state.missing_dates:
-            st.toast("Download Started")
     else:
         st.success("No missing dates are found in the dataset")
\ No newline at end of file